@@ -1,9 +1,15 @@
 import docker
+import os
+import sys
 import threading
 import time
-from queue import Queue
+from concurrent.futures import ThreadPoolExecutor
+from queue import Full, Queue
 from docker import APIClient
 import logging
+from operator import itemgetter
+import requests
+import urllib3
 
 # docker client
 client = docker.from_env()
@@ -15,19 +21,60 @@ THR_max_mem = 55  # Upper memory threshold percentage
 THR_min_mem = 20  # Lower memory threshold percentage
 
 # setup queue to hold overloaded VM nodes
-migration_queue = Queue()
+migration_queue = Queue(maxsize=64)
+
+# ids of VMs queued or being migrated, so an overloaded host does not enqueue the same VM every cycle
+pending_migrations = set()
 
 # thread lock for sync to shared resources
 lock = threading.Lock()
 
+# number of migration threads draining the queue in parallel
+MIGRATION_WORKERS = 4
+
+# shared pool to fan out per-VM stats reads
+STATS_WORKERS = 32
+stats_pool = ThreadPoolExecutor(max_workers=STATS_WORKERS)
+
+# low-level API client shared by one-shot stats reads and migration
+# its keep-alive connection pool is sized so every stats_pool/migration thread can reuse a connection
+api_client = APIClient(base_url='unix://var/run/docker.sock', max_pool_size=STATS_WORKERS + MIGRATION_WORKERS)
+
+# separate client for the StatsStreamer threads, each stream holds its connection for the VM lifetime
+# so the streams would otherwise eat into (and overflow) the api_client pool
+stream_client = APIClient(base_url='unix://var/run/docker.sock')
+
+# latest raw stats sample per container id, filled by the StatsStreamer threads
+latest_stats = {}
+
+# cgroup dirs holding a container counters, v2 (systemd/cgroupfs driver) then v1
+CGROUP_V2_DIRS = ('/sys/fs/cgroup/system.slice/docker-{id}.scope', '/sys/fs/cgroup/docker/{id}')
+CGROUP_V1_DIRS = ('/sys/fs/cgroup/{controller}/system.slice/docker-{id}.scope', '/sys/fs/cgroup/{controller}/docker/{id}')
+
+# total host memory, reported as the limit for containers without one (same as docker stats)
+HOST_MEMORY = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+
+# previous cgroup CPU reading per container id: (usage_usec, monotonic ts)
+prev_cpu = {}
+
+# compose project label, i.e. the host a VM belongs to
+COMPOSE_PROJECT = itemgetter('com.docker.compose.project')
+
+# VM inventory grouped by host (compose project), kept up to date from docker events
+# lists are replaced, never mutated in place, so readers can iterate them without a lock
+containers_by_host = {}
+
 # logging config
-def setup_logging():
+def setup_logging(console=True):
     logging.basicConfig(
         filename='vm_migration.log',  
         filemode='w',
         format='%(asctime)s - %(levelname)s - %(message)s',  # ts, log level, msg
         level=logging.INFO  # log level to INFO
     )
+    # optionally also log to stdout (message only, as plain prints did) instead of print() in the worker threads
+    if console:
+        logging.getLogger().addHandler(logging.StreamHandler(sys.stdout))
 
 # Node class to hold the status and utilization of each host and VM
 # status is {normal, overloaded, underloaded}
@@ -39,13 +86,238 @@ class Node:
         self.status = status
 
 
+# Streams docker stats into `latest_stats` for running VMs whose cgroup is not readable
+# one long-lived reader thread per such container, started/stopped from docker events
+class StatsStreamer:
+    def __init__(self, api_client):
+        self.api_client = api_client
+        self.streams = {}  # container id -> stop event
+        self.streams_lock = threading.Lock()
+
+    def add(self, container_id):
+        # cgroup reads already cover this VM, no need for a thread and an open socket
+        if read_cgroup_stats(container_id) is not None:
+            return
+        with self.streams_lock:
+            if container_id in self.streams:
+                return
+            stop_event = threading.Event()
+            self.streams[container_id] = stop_event
+        threading.Thread(target=self.stream, args=(container_id, stop_event), daemon=True).start()
+
+    def remove(self, container_id):
+        with self.streams_lock:
+            stop_event = self.streams.pop(container_id, None)
+            if stop_event is not None:
+                stop_event.set()
+            latest_stats.pop(container_id, None)
+        prev_cpu.pop(container_id, None)
+
+    def stream(self, container_id, stop_event):
+        # dockerd pushes one JSON sample per second until the container stops
+        # samples are stored under the lock so none lands after remove() dropped the entry
+        try:
+            for raw in self.api_client.stats(container_id, stream=True, decode=True):
+                with self.streams_lock:
+                    if stop_event.is_set():
+                        break
+                    latest_stats[container_id] = raw
+        except (docker.errors.DockerException, requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
+            logging.warning("Stats stream for %s closed: %s", container_id[:12], e)
+        finally:
+            # a stream that ended on its own must not leave its last sample behind,
+            # calculate_utilization then falls back to a fresh one-shot read
+            with self.streams_lock:
+                if self.streams.get(container_id) is stop_event:
+                    del self.streams[container_id]
+                    latest_stats.pop(container_id, None)
+
+
+def add_to_inventory(container):
+    try:
+        host = COMPOSE_PROJECT(container.labels)
+    except KeyError:
+        logging.warning("Skipping %s, it has no compose project label", container.name)
+        return
+    host_vms = containers_by_host.get(host, [])
+    if all(vm.id != container.id for vm in host_vms):
+        containers_by_host[host] = host_vms + [container]
+
+
+def remove_from_inventory(container_id):
+    for host, host_vms in list(containers_by_host.items()):
+        remaining = [vm for vm in host_vms if vm.id != container_id]
+        if len(remaining) == len(host_vms):
+            continue
+        if remaining:
+            containers_by_host[host] = remaining
+        else:
+            del containers_by_host[host]
+
+
+def update_inventory(event, stats_streamer):
+    """
+    Apply a docker container event to `containers_by_host` and the stats streams
+
+    Only running VMs are tracked: started VMs are added to the inventory and get a stats stream,
+    VMs that die are removed and their stream closed, so stopped VMs are never measured.
+
+    Parameters:
+    - event (dict): decoded docker event
+    - stats_streamer (StatsStreamer): streamer to open/close the VM stats stream on
+    """
+    if 'host' not in event['Actor']['Attributes'].get('name', ''):
+        return
+    if event['Action'] == 'start':
+        try:
+            add_to_inventory(client.containers.get(event['id']))
+        except docker.errors.NotFound:
+            return
+        stats_streamer.add(event['id'])
+    elif event['Action'] == 'die':
+        remove_from_inventory(event['id'])
+        stats_streamer.remove(event['id'])
+
+
+def sync_inventory(stats_streamer):
+    """
+    Subscribe to docker container events and (re)build `containers_by_host` from a fresh snapshot
+
+    The event stream is opened before the snapshot is listed so no container change in between
+    is missed. VMs that are no longer running are dropped from the inventory and their stats
+    streams closed.
+
+    Parameters:
+    - stats_streamer (StatsStreamer): streamer to open/close the VM stats streams on
+
+    Returns:
+    - events (generator): decoded docker events following the snapshot
+    """
+    events = client.events(decode=True, filters={'type': 'container', 'event': ['start', 'die']})
+    groups = {}
+    for container in client.containers.list(filters={'name': 'host*', 'status': 'running'}):
+        try:
+            groups.setdefault(COMPOSE_PROJECT(container.labels), []).append(container)
+        except KeyError:
+            logging.warning("Skipping %s, it has no compose project label", container.name)
+            continue
+        stats_streamer.add(container.id)
+
+    running = {vm.id for host_vms in groups.values() for vm in host_vms}
+    for host, host_vms in list(containers_by_host.items()):
+        for vm in host_vms:
+            if vm.id not in running:
+                stats_streamer.remove(vm.id)
+        if host not in groups:
+            del containers_by_host[host]
+    containers_by_host.update(groups)
+    return events
+
+
+def start_inventory(stats_streamer):
+    """
+    Take the initial VM inventory snapshot and keep it in sync from docker events
+
+    Events are consumed in a background thread. A failing event is logged and skipped; if the
+    event stream ends or breaks (e.g. dockerd restart) the snapshot is re-taken and the events
+    re-subscribed, retrying every 3 seconds while dockerd is unreachable.
+
+    Parameters:
+    - stats_streamer (StatsStreamer): streamer to open/close the VM stats streams on
+    """
+    events = sync_inventory(stats_streamer)
+
+    def watch_events():
+        nonlocal events
+        while True:
+            try:
+                for event in events:
+                    try:
+                        update_inventory(event, stats_streamer)
+                    except Exception:
+                        logging.exception("Failed to apply docker event %s for %s", event.get('Action'), event.get('id', '')[:12])
+                logging.warning("Docker event stream ended, re-syncing VM inventory")
+            except (docker.errors.DockerException, requests.exceptions.RequestException):
+                logging.exception("Docker event stream failed, re-syncing VM inventory")
+
+            while True:
+                try:
+                    events = sync_inventory(stats_streamer)
+                    break
+                except (docker.errors.DockerException, requests.exceptions.RequestException):
+                    logging.exception("Re-syncing VM inventory failed, retrying")
+                    time.sleep(3)
+
+    threading.Thread(target=watch_events, daemon=True).start()
+
+
+def read_file(path):
+    with open(path) as f:
+        return f.read()
+
+
+def read_stat_value(stat, key):
+    # value of `key` in a flat-keyed cgroup stat file (cpu.stat, memory.stat), 0 if missing
+    for line in stat.splitlines():
+        name, value = line.split()
+        if name == key:
+            return int(value)
+    return 0
+
+
+def read_cgroup_stats(container_id):
+    '''
+    Read the raw CPU and memory counters of a container straight from the cgroup filesystem
+
+    Both cgroup v2 (cpu.stat, memory.current, memory.max, memory.stat) and v1 (cpuacct.usage,
+    memory.usage_in_bytes, memory.limit_in_bytes, memory.stat) layouts are supported. Like the
+    docker CLI, inactive page cache (inactive_file) is not counted as memory usage.
+
+    Parameters:
+    - container_id (str): full id of the container
+
+    Returns:
+    - (usage_usec, mem_usage, mem_limit) tuple with the total CPU time in microseconds and
+      the memory usage and limit in bytes, or None if the cgroup is not readable (e.g. Docker
+      Desktop, where containers run inside a VM)
+    '''
+    for cgroup_dir in CGROUP_V2_DIRS:
+        cgroup_dir = cgroup_dir.format(id=container_id)
+        try:
+            cpu_stat = read_file(f"{cgroup_dir}/cpu.stat")
+            mem_usage = int(read_file(f"{cgroup_dir}/memory.current"))
+            mem_max = read_file(f"{cgroup_dir}/memory.max").strip()
+            mem_stat = read_file(f"{cgroup_dir}/memory.stat")
+        except OSError:
+            continue
+        usage_usec = read_stat_value(cpu_stat, 'usage_usec')
+        mem_usage = max(0, mem_usage - read_stat_value(mem_stat, 'inactive_file'))
+        mem_limit = HOST_MEMORY if mem_max == 'max' else int(mem_max)
+        return usage_usec, mem_usage, mem_limit
+
+    for cgroup_dir in CGROUP_V1_DIRS:
+        try:
+            usage_usec = int(read_file(cgroup_dir.format(controller='cpuacct', id=container_id) + '/cpuacct.usage')) // 1000
+            mem_dir = cgroup_dir.format(controller='memory', id=container_id)
+            mem_usage = int(read_file(f"{mem_dir}/memory.usage_in_bytes"))
+            mem_limit = int(read_file(f"{mem_dir}/memory.limit_in_bytes"))
+            mem_stat = read_file(f"{mem_dir}/memory.stat")
+        except OSError:
+            continue
+        mem_usage = max(0, mem_usage - read_stat_value(mem_stat, 'total_inactive_file'))
+        return usage_usec, mem_usage, min(mem_limit, HOST_MEMORY)
+
+    return None
+
+
 def calculate_utilization(container):
     '''
     Calculate the CPU and memory utilization percentages for a given Docker container
 
-    Function gets a container current stats, computes the CPU utilization by
-    finding the difference in CPU usage since the last stats read, and calculates the memory
-    utilization based on current usage and the total available memory limit for the container
+    Function reads the container counters from its cgroup (falling back to the latest streamed
+    docker stats when the cgroup is not readable), computes the CPU utilization by finding the
+    difference in CPU usage since the last stats read, and calculates the memory utilization
+    based on current usage and the total available memory limit for the container
 
     Parameters:
     - container (docker.models.containers.Container): input container to calculate utilization
@@ -56,61 +328,104 @@ def calculate_utilization(container):
 
     CPU utilization is calculated as the difference in total CPU usage divided by the difference
     in system CPU usage, multiplied by the number of online CPUs, and then multiplied by 100 to get
-    percentage.
+    percentage. For cgroup reads the system CPU usage is the elapsed wall time across all online
+    CPUs, so this reduces to the CPU time delta over the wall time delta.
 
-    The memory utilization is calculated as the current memory usage divided by the memory limit,
-    multiplied by 100 to get percentage.
+    The memory utilization is calculated as the current memory usage, minus the inactive page cache
+    (as the docker CLI does), divided by the memory limit, multiplied by 100 to get percentage.
 
     If the pre-read CPU statistics are not available,  CPU utilization is calculated as zero 
-    to avoid division by zero errors.
+    to avoid division by zero errors. If no sample has been streamed for the container yet,
+    a one-shot (blocking) stats read is done instead.
     '''
-    stats = container.stats(stream=False)
-    cpu_percent = 0.0
-    memory_percent = 0.0
-
-    if 'system_cpu_usage' in stats['cpu_stats'] and 'precpu_stats' in stats and \
-       'cpu_usage' in stats['precpu_stats']:
-        cpu_delta = stats['cpu_stats']['cpu_usage']['total_usage'] - \
-                    stats['precpu_stats']['cpu_usage'].get('total_usage', 0)
-        system_delta = stats['cpu_stats']['system_cpu_usage'] - \
-                       stats['precpu_stats'].get('system_cpu_usage', 0)
+    cgroup_stats = read_cgroup_stats(container.id)
+    if cgroup_stats is not None:
+        usage_usec, mem_usage, mem_limit = cgroup_stats
+        now = time.monotonic()
+        prev = prev_cpu.get(container.id)
+        prev_cpu[container.id] = (usage_usec, now)
+        cpu_percent = 0.0
+        if prev is not None and now > prev[1]:
+            cpu_percent = (usage_usec - prev[0]) / ((now - prev[1]) * 1e6) * 100
+        return cpu_percent, mem_usage / mem_limit * 100
+
+    stats = latest_stats.get(container.id)
+    if stats is None:
+        try:
+            stats = api_client.stats(container.id, stream=False)
+        except docker.errors.NotFound:
+            # removed since the inventory was read, the next event drops it
+            return 0.0, 0.0
+        except (docker.errors.DockerException, requests.exceptions.RequestException):
+            # e.g. dockerd restarting, keep the monitor thread alive and read the VM as idle this cycle
+            logging.exception("Stats read for %s failed", container.name)
+            return 0.0, 0.0
+    # direct indexing, a missing counter (e.g. no precpu sample yet) falls back to zero
+    try:
+        cpu_stats = stats['cpu_stats']
+        precpu_stats = stats['precpu_stats']
+        cpu_delta = cpu_stats['cpu_usage']['total_usage'] - precpu_stats['cpu_usage']['total_usage']
+        system_delta = cpu_stats['system_cpu_usage'] - precpu_stats['system_cpu_usage']
         if system_delta > 0 and cpu_delta > 0:
-            cpu_percent = (cpu_delta / system_delta) * stats['cpu_stats']['online_cpus'] * 100
-
-    if 'usage' in stats['memory_stats'] and 'limit' in stats['memory_stats']:
-        memory_percent = (stats['memory_stats']['usage'] / stats['memory_stats']['limit']) * 100
+            cpu_percent = (cpu_delta / system_delta) * cpu_stats['online_cpus'] * 100
+        else:
+            cpu_percent = 0.0
+    except KeyError:
+        cpu_percent = 0.0
+
+    try:
+        memory_stats = stats['memory_stats']
+        # page cache is counted in usage, drop the inactive part (total_inactive_file on cgroup v1)
+        mem_stat = memory_stats.get('stats', {})
+        inactive = mem_stat.get('total_inactive_file', mem_stat.get('inactive_file', 0))
+        usage = max(0, memory_stats['usage'] - inactive)
+        memory_percent = (usage / memory_stats['limit']) * 100
+    except KeyError:
+        memory_percent = 0.0
 
     return cpu_percent, memory_percent
 
 
-def calculate_average_load(vms):
+def measure_vms(vms):
+    """
+    Measure CPU and memory util for a list of VMs (containers)
+
+    Function computes the CPU and memory utilization of each VM once, fanned out over
+    `stats_pool` so any blocking stats reads overlap. Called once per cycle with the VMs of
+    all hosts so the whole scan is a single burst of (mostly cgroup file) reads
+
+    Parameters:
+    - vms (list): list of VM (container) objects to measure
+
+    Returns:
+    - utils (list): (vm, cpu_percent, memory_percent) tuple for each VM
     """
-    Calculate average CPU and memory util for a list of VMs (containers)
+    return [(vm, cpu, mem) for vm, (cpu, mem) in zip(vms, stats_pool.map(calculate_utilization, vms))]
 
-    Function iterates over each VM, computes its CPU and memory utilization, 
-    and calculates the average values across list of input VMs
+
+def calculate_average_load(utils):
+    """
+    Calculate average CPU and memory util for a list of measured VMs (containers)
 
     Parameters:
-    - vms (list): list of VM (container) objects to calculate the average load
+    - utils (list): (vm, cpu_percent, memory_percent) tuples as returned by `measure_vms`
 
     Returns:
     - avg_cpu (float): average CPU utilization percentage across all VMs
     - avg_mem (float): average memory utilization percentage across all VMs
     """
-    total_cpu = total_mem = 0
-    for vm in vms:
-        cpu, mem = calculate_utilization(vm)
-        total_cpu += cpu
-        total_mem += mem
-    avg_cpu = total_cpu / len(vms)
-    avg_mem = total_mem / len(vms)
+    _, cpus, mems = zip(*utils)
+    avg_cpu = sum(cpus) / len(utils)
+    avg_mem = sum(mems) / len(utils)
     return avg_cpu, avg_mem
 
 # function to set host sttus basis static threshold
-def determine_host_status(avg_cpu, avg_mem):
-    if avg_cpu > THR_max_cpu or avg_mem > THR_max_mem:
+# thresholds are bound as defaults at def time so they are local lookups in the hot loop
+def determine_host_status(avg_cpu, avg_mem, max_cpu=THR_max_cpu, max_mem=THR_max_mem,
+                          min_cpu=THR_min_cpu, min_mem=THR_min_mem):
+    if avg_cpu > max_cpu or avg_mem > max_mem:
         return 'overloaded'
-    elif avg_cpu < THR_min_cpu and avg_mem < THR_min_mem:
+    elif avg_cpu < min_cpu and avg_mem < min_mem:
         return 'underloaded'
     else:
         return 'normal'
@@ -120,30 +435,56 @@ def monitor_hosts():
     """
     Continuously monitor and evaluate the load status of each VM for eah host
 
-    Function lists all containers that match the 'host*' pattern, groups them by their associated host,
-    calculates the average CPU and memory utilization for the VMs on each host, and determines the host's
-    load status as overloaded, underloaded, or normal based on static thresholds. Overloaded VMs are
-    identified and enqueued for migration.
+    Function takes all running containers that match the 'host*' pattern from the `containers_by_host` inventory,
+    measures all of them in one pass, groups the readings by their associated host, calculates the average
+    CPU and memory utilization for the VMs on each host, and determines the host's load status as overloaded,
+    underloaded, or normal based on static thresholds. Overloaded VMs are identified and enqueued for migration.
 
     The function updates the global `host_loads` dictionary with current load and status for each host in each iteration
-    Also prints this information to the console. Set up a 3 second pause between iteration
+    Also logs this information (to the log file and console). Set up a 3 second pause between iteration
     """
+    # bind globals used every cycle to locals
+    log_info = logging.info
+    sleep = time.sleep
     while True:
-        hosts = client.containers.list(all=True, filters={'name': 'host*'})
-        for host in set(container.labels['com.docker.compose.project'] for container in hosts):
-            host_vms = [container for container in hosts if container.labels['com.docker.compose.project'] == host]
-            avg_cpu, avg_mem = calculate_average_load(host_vms)
+        # measure every VM of every host from the cached inventory in one burst
+        inventory = list(containers_by_host.items())
+        all_utils = iter(measure_vms([vm for _, host_vms in inventory for vm in host_vms]))
+        for host, host_vms in inventory:
+            utils = [next(all_utils) for _ in host_vms]
+            avg_cpu, avg_mem = calculate_average_load(utils)
             host_status = determine_host_status(avg_cpu, avg_mem)
             
-            with lock:
-                host_loads[host] = Node(host, avg_cpu, avg_mem, host_status)  # init VM Node object
-                if host_status == 'overloaded':
-                    max_vm = max(host_vms, key=lambda vm: calculate_utilization(vm)[0] + calculate_utilization(vm)[1])  ## VM with max resource util
-                    migration_queue.put(max_vm)
+            # single-key dict writes are thread-safe on their own
+            host_loads[host] = Node(host, avg_cpu, avg_mem, host_status)  # init VM Node object
+            if host_status == 'overloaded':
+                max_vm = max(utils, key=lambda u: u[1] + u[2])[0]  ## VM with max resource util
+                enqueue_migration(max_vm)
             
-            logging.info(f"Host: {host}, Status: {host_status}, Average CPU: {avg_cpu:.2f}%, Average Memory: {avg_mem:.2f}%")
-            print(f"Host: {host}, Status: {host_status}, Average CPU: {avg_cpu:.2f}%, Average Memory: {avg_mem:.2f}%")
-        time.sleep(3)
+            log_info("Host: %s, Status: %s, Average CPU: %.2f%%, Average Memory: %.2f%%", host, host_status, avg_cpu, avg_mem)
+        sleep(3)
+
+
+def enqueue_migration(vm):
+    """
+    Queue a VM for migration unless it is already queued or being migrated
+
+    If the bounded migration queue is full the VM is dropped; it is picked again on a later cycle
+    if its host is still overloaded.
+
+    Parameters:
+    - vm (docker.models.containers.Container): VM (container) to migrate
+    """
+    with lock:
+        if vm.id in pending_migrations:
+            return
+        pending_migrations.add(vm.id)
+    try:
+        migration_queue.put_nowait(vm)
+    except Full:
+        with lock:
+            pending_migrations.discard(vm.id)
+        logging.warning("Migration queue full, skipped %s", vm.name)
 
 
 def handle_migration():
@@ -154,36 +495,36 @@ def handle_migration():
     committing its state to a new image, and starting a new VM from that image on the same host. The migration
     is simulated on the local Docker host for simplicity.
 
-    The function runs in an infinite loop, checking the migration queue every 2 seconds for new VMs to migrate.
+    The function runs in an infinite loop, blocking on the migration queue until a new VM to migrate arrives.
+    Several threads run it in parallel (`MIGRATION_WORKERS`), each owning the VM it dequeued.
     """
-    # init low-level API client
-    api_client = APIClient(base_url='unix://var/run/docker.sock')
     while True:
-        if not migration_queue.empty():
-            with lock: # acquire lock
-                vm_migrate = migration_queue.get()
-                
-                # this is a placeholder for simulating the target host
-                # in future a secure docker daemon socket will be used to handle this migration to the target host using TCP 
-                target_host = 'localhost'  
-
-                # stop the VM on the current host
-                vm_migrate.stop()
-                logging.info(f"Stopped {vm_migrate.name} for migration")
-                print(f"Stopped {vm_migrate.name} for migration")
-
-                # commit container state to a new image
-                # migrated vm prefixed with migrated-*
-                new_image = api_client.commit(container=vm_migrate.id, repository=f"migrated-{vm_migrate.name}")
-                logging.info(f"Committed {vm_migrate.name} to a new image")
-                print(f"Committed {vm_migrate.name} to a new image")
-
-                # start a new VM from the migrated image on the same Docker host
-                migrated_container = client.containers.run(new_image['Id'], name=f"migrated-{vm_migrate.name}", detach=True)
-                logging.info(f"Migrated {vm_migrate.name} to {migrated_container.name} on {target_host}")
-                print(f"Migrated {vm_migrate.name} to {migrated_container.name} on {target_host}")
-
-        time.sleep(2)
+        # block until a VM is queued; the dequeued VM is owned by this thread, no lock needed while migrating
+        vm_migrate = migration_queue.get()
+        
+        try:
+            # this is a placeholder for simulating the target host
+            # in future a secure docker daemon socket will be used to handle this migration to the target host using TCP 
+            target_host = 'localhost'  
+
+            # stop the VM on the current host
+            vm_migrate.stop()
+            logging.info("Stopped %s for migration", vm_migrate.name)
+
+            # commit container state to a new image
+            # migrated vm prefixed with migrated-*
+            new_image = api_client.commit(container=vm_migrate.id, repository=f"migrated-{vm_migrate.name}")
+            logging.info("Committed %s to a new image", vm_migrate.name)
+
+            # start a new VM from the migrated image on the same Docker host
+            migrated_container = client.containers.run(new_image['Id'], name=f"migrated-{vm_migrate.name}", detach=True)
+            logging.info("Migrated %s to %s on %s", vm_migrate.name, migrated_container.name, target_host)
+        except (docker.errors.DockerException, requests.exceptions.RequestException):
+            # keep the worker alive, e.g. on a 409 when migrated-<name> already exists or a commit timeout
+            logging.exception("Migration of %s failed", vm_migrate.name)
+        finally:
+            with lock:
+                pending_migrations.discard(vm_migrate.id)
 
 def main():
     """
@@ -197,17 +538,23 @@ def main():
     global host_loads
     host_loads = {}
 
+    # build the VM inventory and start streaming container stats in the background
+    stats_streamer = StatsStreamer(stream_client)
+    start_inventory(stats_streamer)
+
     # start monitoring thread
     monitor_thread = threading.Thread(target=monitor_hosts)
     monitor_thread.start()
 
-    # start migration thread
-    migration_thread = threading.Thread(target=handle_migration)
-    migration_thread.start()
+    # start migration threads, each migrating one dequeued VM at a time
+    migration_threads = [threading.Thread(target=handle_migration) for _ in range(MIGRATION_WORKERS)]
+    for migration_thread in migration_threads:
+        migration_thread.start()
 
     # join
     monitor_thread.join()
-    migration_thread.join()
+    for migration_thread in migration_threads:
+        migration_thread.join()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file